@@ -0,0 +1,62 @@
+import orjson
+import requests
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Base URL of the monitoring API server
+API_BASE_URL = "http://127.0.0.1:5000"
+
+# Shared HTTP session for every call to the API.
+# Connections are kept alive and reused between menu actions instead of
+# opening a new TCP connection per request. Failures are retried briefly:
+# errors while connecting are retried for every method, POST included, since
+# the request never reached the server; errors after the request was sent
+# (read errors) are only retried for idempotent methods, so a POST the server
+# may have received is never sent twice.
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.2),
+)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+
+# Last instances list received from GET /instances and its ETag
+_INSTANCES_CACHE = {"etag": None, "instances": None}
+
+# Fetches all instances with a conditional GET and returns (status_code, instances).
+# While nothing has changed the server answers 304 with no body and the list parsed
+# last time is returned as is. instances is None when the server returned an error.
+# Network errors are raised to the caller.
+def get_instances(timeout=5):
+    headers = {}
+    if _INSTANCES_CACHE["etag"] is not None:
+        headers["If-None-Match"] = _INSTANCES_CACHE["etag"]
+
+    response = SESSION.get(f"{API_BASE_URL}/instances", headers=headers, timeout=timeout)
+
+    if response.status_code == 304:
+        return 200, _INSTANCES_CACHE["instances"]
+    if response.status_code != 200:
+        return response.status_code, None
+
+    instances = orjson.loads(response.content).get("instances", [])
+    _INSTANCES_CACHE.update(etag=response.headers.get("ETag"), instances=instances)
+    return 200, instances
+
+# URL of one machine's resource. The name is percent-encoded as a single path
+# segment, so names containing "/", "?" or "#" still address that machine
+def instance_url(name):
+    return f"{API_BASE_URL}/instances/{quote(name, safe='')}"
+
+# Asks the API whether a machine with this name exists (HEAD /instances/<name>),
+# so no machine list is transferred. Errors other than 404 and network errors
+# are raised to the caller.
+def machine_exists(name, timeout=3):
+    response = SESSION.head(instance_url(name), timeout=timeout)
+    if response.status_code == 404:
+        return False
+    response.raise_for_status()
+    return True
@@ -1,113 +1,564 @@
-from flask import Flask, jsonify, request
-import json
+from flask import Flask, Response, jsonify, request
+import hashlib
+import mmap
+import multiprocessing
+import orjson
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, wraps
 from pathlib import Path
-from machine_model import VMInstance
+from readerwriterlock import rwlock
+from pydantic import TypeAdapter, ValidationError
+from machine_model import VMInstance, errors_by_index
 from logger import logger
-from storage import backup_instances_file
+from storage import INSTANCES_PATH, JOURNAL_PATH, backup_instances_file, replay_journal
 
 app = Flask(__name__)
 
-# Path to the instances JSON file
-INSTANCES_FILE = Path("configs/instances.json")
+# Path to the instances JSON file (the snapshot); the same file the CLI reads, wherever the server is started from
+INSTANCES_FILE = Path(INSTANCES_PATH)
+
+# Append-only journal of mutations not yet folded into the snapshot
+JOURNAL_FILE = Path(JOURNAL_PATH)
+
+# Rewrite the snapshot (and back it up) once the journal holds this many records
+COMPACT_THRESHOLD = 100
+
+# Validators bound once at import: one for single payloads, one for whole lists
+_VALIDATE_ONE = VMInstance.model_validate
+_VALIDATE_MANY = TypeAdapter(list[VMInstance]).validate_python
+
+
+def _etag(body):
+    """Strong ETag value for a GET /instances body (hash of its content)."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+# Serialized GET /instances body for an empty or missing file
+_EMPTY_BODY = b'{"instances":[]}'
+_EMPTY_ETAG = _etag(_EMPTY_BODY)
+
+# Numeric fields averaged by GET /stats
+_METRICS = ("response_time_ms", "cpu_percent", "memory_percent")
+
+
+def _new_stats():
+    """Empty aggregates for GET /stats: counters plus a running (sum, count) per metric."""
+    return {
+        "total": 0,
+        "up": 0,
+        "os": {},
+        "health": {},
+        "metrics": {field: [0, 0] for field in _METRICS},
+    }
+
+
+# In-memory copy of the instances file, keyed on its mtime and size (-1 while the file
+# doesn't exist, None to force a reload), plus a name -> list index map for O(1) lookups,
+# the serialized GET body with its ETag (None until the next GET after a mutation or reload),
+# and running aggregates maintained on every mutation.
+# Only changed under the write lock; readers just read it
+_CACHE = {
+    "mtime_ns": -1,
+    "size": -1,
+    "instances": [],
+    "by_name": {},
+    "body": _EMPTY_BODY,
+    "etag": _EMPTY_ETAG,
+    "stats": _new_stats(),
+}
+
+# Batches larger than this are validated in chunks across worker processes;
+# smaller ones are validated inline, where IPC would cost more than it saves
+PARALLEL_VALIDATION_MIN = 500
+PARALLEL_VALIDATION_CHUNK = 250
+_POOL = None
+
+# Open journal file handle, the number of records it holds and the last sequence
+# number given to a record (stored in the snapshot as "seq" when compacting)
+_JOURNAL = {"file": None, "entries": 0, "seq": 0}
+
+# Readers/writer lock around the instances file and cache:
+# GETs run concurrently, mutations are exclusive
+_LOCK = rwlock.RWLockFair()
+
+
+def _reads_instances(view, needs_body=False):
+    """
+    Run the view while holding the shared (read) lock, against a current cache.
+    Readers never modify the cache: when the snapshot changed on disk (or the view
+    needs the GET body and it is stale), the cache is refreshed under the exclusive
+    lock first and the check is repeated under the shared one.
+    """
+    def ready():
+        return _cache_is_current() and not (needs_body and _CACHE["body"] is None)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        while True:
+            with _LOCK.gen_rlock():
+                if ready():
+                    return view(*args, **kwargs)
+            with _LOCK.gen_wlock():
+                _load_instances()
+                if needs_body:
+                    _render_body()
+    return wrapper
+
+
+def _reads_body(view):
+    """Like _reads_instances, for views that serve the cached GET /instances body."""
+    return _reads_instances(view, needs_body=True)
+
+
+def _writes_instances(view):
+    """Run the view while holding the exclusive (write) lock."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with _LOCK.gen_wlock():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def _as_list(data):
+    """
+    Normalize parsed file content to the instances list.
+    Accepts {"instances": [...]} (the usual case, checked first) or a bare list.
+    """
+    t = type(data)
+    if t is dict:
+        return data.get("instances", [])
+    if t is list:
+        return data
+    return []
+
+
+def _text(value, default):
+    """A field value as a string for bucketing; missing and null both give the default."""
+    return default if value is None else str(value)
+
+
+@lru_cache(maxsize=1024)
+def _normalize_os(value):
+    """
+    First word of an OS string, lowercased ("Ubuntu 22.04" -> "ubuntu").
+    Memoized: there are only a handful of distinct OS strings, so each is split once.
+    """
+    # maxsplit=1: only the first word is needed, don't split the rest
+    words = value.split(None, 1)
+    return words[0].lower() if words else "unknown"
+
+
+def _os_key(inst):
+    """Statistics bucket for an instance's OS."""
+    return _normalize_os(_text(inst.get("os"), "unknown"))
+
+
+def _count(stats, inst, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) one instance's contribution to the aggregates.
+    An update is a removal of the old record followed by an addition of the new one.
+    """
+    stats["total"] += sign
+    if inst.get("status") == "UP":
+        stats["up"] += sign
+    os_counter, health_counter = stats["os"], stats["health"]
+    key = _os_key(inst)
+    os_counter[key] = os_counter.get(key, 0) + sign
+    key = _text(inst.get("health"), "UNKNOWN").upper()
+    health_counter[key] = health_counter.get(key, 0) + sign
+    for field, acc in stats["metrics"].items():
+        value = inst.get(field)
+        if isinstance(value, (int, float)):
+            acc[0] += sign * value
+            acc[1] += sign
+
+
+def _read_snapshot():
+    """
+    Parse the snapshot file directly from a read-only memory map,
+    so the raw bytes come from the page cache instead of a read() into a new buffer.
+    """
+    with INSTANCES_FILE.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap can't map an empty file; let orjson report it as invalid JSON
+            return orjson.loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+
+def _cache_is_current():
+    """Whether the cache still matches the snapshot on disk (by mtime and size, or absence)."""
+    try:
+        st = INSTANCES_FILE.stat()
+    except FileNotFoundError:
+        return _CACHE["mtime_ns"] == -1
+    return (st.st_mtime_ns, st.st_size) == (_CACHE["mtime_ns"], _CACHE["size"])
+
+
+def _load_instances():
+    """
+    Return the list of instances (snapshot + journal), or None if the snapshot doesn't exist.
+    The files are only re-read and re-parsed when the snapshot's mtime or size has changed;
+    journal appends made by this process update the cache directly.
+    Must be called with the write lock held: it replaces the cache and the journal counters.
+    """
+    try:
+        st = INSTANCES_FILE.stat()
+    except FileNotFoundError:
+        _CACHE.update(
+            mtime_ns=-1, size=-1, instances=[], by_name={},
+            body=_EMPTY_BODY, etag=_EMPTY_ETAG, stats=_new_stats(),
+        )
+        return None
+
+    if (st.st_mtime_ns, st.st_size) == (_CACHE["mtime_ns"], _CACHE["size"]):
+        return _CACHE["instances"]
+
+    data = _read_snapshot()
+    instances = _as_list(data)
+    snapshot_seq = data.get("seq", 0) if type(data) is dict else 0
+
+    _JOURNAL["entries"], _JOURNAL["seq"] = replay_journal(instances, JOURNAL_FILE, snapshot_seq)
+
+    # First occurrence wins, matching a front-to-back scan
+    by_name = {}
+    stats = _new_stats()
+    for i, inst in enumerate(instances):
+        by_name.setdefault(inst.get("name"), i)
+        _count(stats, inst)
+
+    _CACHE.update(
+        mtime_ns=st.st_mtime_ns,
+        size=st.st_size,
+        instances=instances,
+        by_name=by_name,
+        body=None,
+        etag=None,
+        stats=stats,
+    )
+    return instances
+
+
+def _render_body():
+    """
+    Serialize the GET /instances body and its ETag if a mutation or reload left them stale.
+    Done on the first GET after the change rather than per mutation, so a run of writes
+    costs one O(N) serialization instead of one each. Called with the write lock held.
+    """
+    if _CACHE["body"] is None:
+        body = orjson.dumps({"instances": _CACHE["instances"]})
+        _CACHE.update(body=body, etag=_etag(body))
+
+
+def _atomic_write_json(path, obj):
+    """
+    Write obj as JSON to a temporary file next to path and rename it over path.
+    os.replace is atomic on the same filesystem, so readers always see either
+    the old or the new file, never a truncated one.
+    The data is fsync'd before the rename so a crash can't leave an empty file behind it,
+    and the directory after it so the rename itself survives a crash.
+    Returns the bytes that were written.
+    """
+    data = orjson.dumps(obj)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(path.parent)
+    return data
+
+
+def _fsync_dir(directory):
+    """fsync a directory so renames in it are durable (no-op where directories can't be opened)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _validate_chunk(items, offset=0):
+    """
+    Validate a list of VM payloads in one pass.
+    Returns (names, errors) where errors maps item index (shifted by offset) to messages.
+    Module-level so it can run in a worker process; only names and messages are sent
+    back, since pickling whole VMInstance objects would cost more than validating them.
+    """
+    try:
+        return [vm.name for vm in _VALIDATE_MANY(items)], {}
+    except ValidationError as e:
+        return [], errors_by_index(e, offset)
+
+
+def _usable_cpus():
+    """Number of CPUs this process may run on (respects affinity/cgroup limits where the OS exposes them)."""
+    if hasattr(os, "process_cpu_count"):
+        return os.process_cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _validation_pool():
+    """Return the process pool for large batch validations, creating it on first use."""
+    global _POOL
+    if _POOL is None:
+        # spawn, not fork: the server process runs threads (request workers, log listener)
+        _POOL = ProcessPoolExecutor(max_workers=_usable_cpus(), mp_context=multiprocessing.get_context("spawn"))
+    return _POOL
+
+
+def _journal_file():
+    """Return the journal opened for appending, opening it on first use."""
+    if _JOURNAL["file"] is None:
+        journal = JOURNAL_FILE.open("ab+")
+
+        # Terminate a torn last line so the next record starts on its own line
+        if journal.seek(0, os.SEEK_END) > 0:
+            journal.seek(-1, os.SEEK_END)
+            if journal.read(1) != b"\n":
+                journal.write(b"\n")
+
+        _JOURNAL["file"] = journal
+    return _JOURNAL["file"]
+
+
+def _truncate_journal():
+    """Empty the journal file (durably) once its records are no longer needed."""
+    journal = _journal_file()
+    journal.truncate(0)
+    os.fsync(journal.fileno())
+    _JOURNAL["entries"] = 0
+
+
+def _compact():
+    """
+    Fold the journal into the snapshot: back up the old snapshot,
+    atomically write the cached list with the last journaled sequence number,
+    then truncate the journal.
+    """
+    backup_instances_file()
+    _atomic_write_json(INSTANCES_FILE, {"seq": _JOURNAL["seq"], "instances": _CACHE["instances"]})
+
+    # Truncate only after the new snapshot is in place; a crash in between leaves
+    # records numbered at or below the snapshot's "seq", which replay_journal skips
+    _truncate_journal()
+
+    st = INSTANCES_FILE.stat()
+    _CACHE.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+
+
+def _commit(records):
+    """
+    Persist mutations the handler has already applied to the cached list and index.
+    Each record gets the next sequence number and is appended to the journal as one
+    JSON line (fsync'd once per call), so the disk write costs O(record) instead of
+    rewriting the whole file. The snapshot is rewritten only when it is missing or
+    the journal is full. The cached GET body and its ETag are only marked stale here;
+    the next GET /instances rebuilds them.
+    """
+    # The handler already changed the list, so the body is stale whether or not the write succeeds
+    _CACHE.update(body=None, etag=None)
+
+    for record in records:
+        _JOURNAL["seq"] += 1
+        record["seq"] = _JOURNAL["seq"]
+
+    try:
+        if not INSTANCES_FILE.exists():
+            # A leftover journal has no snapshot to apply to: drop it before the first snapshot
+            _truncate_journal()
+            _compact()
+        elif _JOURNAL["entries"] + len(records) >= COMPACT_THRESHOLD:
+            _compact()
+        else:
+            journal = _journal_file()
+            journal.write(b"".join(orjson.dumps(record) + b"\n" for record in records))
+            journal.flush()
+            os.fsync(journal.fileno())
+            _JOURNAL["entries"] += len(records)
+    except Exception:
+        # Memory is now ahead of disk: force a reload on the next access
+        _CACHE["mtime_ns"] = None
+        raise
 
 
 @app.get("/instances")
+@_reads_body
 def get_instances():
     """
     Return all VM instances in a normalized structure:
     {"instances": [...]}
+    Supports conditional requests: a matching If-None-Match gets 304 Not Modified.
     """
-    if not INSTANCES_FILE.exists():
-        return jsonify({"instances": []})
+    # The body is serialized once per change, not per request
+    response = Response(_CACHE["body"], mimetype="application/json")
+    response.set_etag(_CACHE["etag"])
+    response.cache_control.private = True
+    response.cache_control.must_revalidate = True
+    return response.make_conditional(request)
 
-    with INSTANCES_FILE.open("r", encoding="utf-8") as f:
-        data = json.load(f)
 
-    # Normalize to ensure "instances" is always a list
-    if isinstance(data, dict) and "instances" in data:
-        instances = data["instances"]
-    elif isinstance(data, list):
-        instances = data
-    else:
-        instances = []
+@app.get("/instances/<path:name>")
+@_reads_instances
+def get_instance(name):
+    """
+    Return a single VM instance by name, or 404 if there is none.
+    HEAD is answered by the same view, so clients can test whether
+    a name exists without transferring the machine list.
+    """
+    index = _CACHE["by_name"].get(name)
+    if index is None:
+        return jsonify({"error": f"Machine '{name}' not found"}), 404
+
+    return jsonify(_CACHE["instances"][index]), 200
+
+
+@app.get("/stats")
+@_reads_instances
+def get_stats():
+    """
+    Return aggregate statistics over all instances.
+    Served from counters kept up to date on every mutation, so this is O(1)
+    in the number of machines (only the distinct OS/health values are listed).
+    """
+    stats = _CACHE["stats"]
+
+    averages = {
+        field: (total / count if count else 0)
+        for field, (total, count) in stats["metrics"].items()
+    }
 
-    return jsonify({"instances": instances})
+    return jsonify({
+        "total": stats["total"],
+        "up": stats["up"],
+        "down": stats["total"] - stats["up"],
+        "os": {key: n for key, n in stats["os"].items() if n > 0},
+        "health": {key: n for key, n in stats["health"].items() if n > 0},
+        "averages": averages,
+    }), 200
 
 
 @app.post("/instances")
+@_writes_instances
 def add_instance():
     """
     Add a new VM instance:
+    - Prevent duplicate names (checked first, so rejects skip validation)
     - Validate using Pydantic model
-    - Prevent duplicate names
-    - Write to JSON file with backup
+    - Persist via the journal (snapshot rewritten and backed up on compaction)
     """
     payload = request.get_json(silent=True) or {}
 
-    # Step 1: Validate using Pydantic model
-    try:
-        vm = VMInstance(**payload)
-    except Exception as e:
-        logger.error(f"Invalid VM payload: {e}")
-        return jsonify({"error": str(e)}), 400
+    # Step 1: Load existing instances
+    instances = _load_instances()
+    if instances is None:
+        # No file yet: append to the cached (empty) list, which is what _commit() writes
+        instances = _CACHE["instances"]
 
-    # Step 2: Load existing instances
-    if INSTANCES_FILE.exists():
-        with INSTANCES_FILE.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+    by_name = _CACHE["by_name"]
 
-        if isinstance(data, dict) and "instances" in data:
-            instances = data["instances"]
-        elif isinstance(data, list):
-            instances = data
-        else:
-            instances = []
-    else:
-        instances = []
+    # Step 2: Prevent duplicate VM names, before paying for validation
+    name = payload.get("name") if isinstance(payload, dict) else None
+    if isinstance(name, str) and name in by_name:
+        return jsonify({"error": f"Machine '{name}' already exists"}), 409
 
-    # Step 3: Prevent duplicate VM names
-    if any(inst.get("name") == vm.name for inst in instances):
-        return jsonify({"error": f"Machine '{vm.name}' already exists"}), 409
+    # Step 3: Validate using Pydantic model
+    try:
+        vm = _VALIDATE_ONE(payload)
+    except Exception as e:
+        logger.error("Invalid VM payload: %s", e)
+        return jsonify({"error": str(e)}), 400
 
     # Step 4: Append new machine and save file
+    by_name[vm.name] = len(instances)
     instances.append(payload)
-    full_data = {"instances": instances}
-
-    backup_instances_file()
+    _count(_CACHE["stats"], payload)
 
-    with INSTANCES_FILE.open("w", encoding="utf-8") as f:
-        json.dump(full_data, f, indent=4)
+    _commit([{"op": "add", "inst": payload}])
 
-    logger.info(f"Machine '{vm.name}' added via API")
+    logger.info("Machine '%s' added via API", vm.name)
     return jsonify({"status": "ok"}), 201
 
-@app.put("/instances/<string:name>")
+
+@app.post("/instances:batch")
+def add_instances_batch():
+    """
+    Add several VM instances in one request: {"instances": [...]}
+    - Validate every item (all-or-nothing), in worker processes for large batches
+    - Reject duplicates against existing machines and within the batch
+    - Persist the whole batch with a single journal write
+    """
+    payload = request.get_json(silent=True) or {}
+    items = payload.get("instances") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        return jsonify({"error": "Expected a JSON object with an 'instances' list"}), 400
+
+    # Step 1: Validate the whole list, reporting errors per index.
+    # Done before taking the write lock so readers aren't blocked meanwhile.
+    if len(items) > PARALLEL_VALIDATION_MIN:
+        offsets = range(0, len(items), PARALLEL_VALIDATION_CHUNK)
+        chunks = [items[i:i + PARALLEL_VALIDATION_CHUNK] for i in offsets]
+        results = list(_validation_pool().map(_validate_chunk, chunks, offsets))
+    else:
+        results = [_validate_chunk(items)]
+
+    names = [name for chunk_names, _ in results for name in chunk_names]
+    by_index = {i: msgs for _, chunk_errors in results for i, msgs in chunk_errors.items()}
+
+    if by_index:
+        errors = [{"index": i, "error": "; ".join(msgs)} for i, msgs in sorted(by_index.items())]
+        logger.error("Invalid VM batch payload: %s", errors)
+        return jsonify({"errors": errors}), 400
+
+    with _LOCK.gen_wlock():
+        # Step 2: Load existing instances
+        instances = _load_instances()
+        if instances is None:
+            instances = _CACHE["instances"]
+        by_name = _CACHE["by_name"]
+
+        # Step 3: Prevent duplicate VM names (existing or repeated in the batch)
+        seen = set()
+        duplicates = []
+        for name in names:
+            if name in by_name or name in seen:
+                duplicates.append(name)
+            seen.add(name)
+
+        if duplicates:
+            return jsonify({"error": f"Machines already exist: {', '.join(duplicates)}", "names": duplicates}), 409
+
+        # Step 4: Append all machines and journal them with a single fsync
+        for name, item in zip(names, items):
+            by_name[name] = len(instances)
+            instances.append(item)
+            _count(_CACHE["stats"], item)
+
+        _commit([{"op": "add", "inst": item} for item in items])
+
+    logger.info("%s machines added via API batch", len(items))
+    return jsonify({"status": "ok", "added": len(items)}), 201
+
+@app.put("/instances/<path:name>")
+@_writes_instances
 def update_instance(name):
     # Get payload from client (partial updates allowed)
     payload = request.get_json(silent=True) or {}
 
-    # If file doesn't exist, nothing to update
-    if not INSTANCES_FILE.exists():
+    # Load current instances (if file doesn't exist, nothing to update)
+    instances = _load_instances()
+    if instances is None:
         return jsonify({"error": "No instances file found"}), 404
 
-    # Load current instances
-    with INSTANCES_FILE.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    # Normalize structure to always work with "instances" list
-    if isinstance(data, dict) and "instances" in data:
-        instances = data["instances"]
-    elif isinstance(data, list):
-        instances = data
-    else:
-        instances = []
-
     # Find machine by its unique name
-    index = None
-    for i, inst in enumerate(instances):
-        if inst.get("name") == name:
-            index = i
-            break
+    by_name = _CACHE["by_name"]
+    index = by_name.get(name)
 
     # If machine is not found — cannot update
     if index is None:
@@ -118,72 +569,63 @@ def update_instance(name):
 
     # Validate updated data using Pydantic model
     try:
-        vm = VMInstance(**merged)
+        vm = _VALIDATE_ONE(merged)
     except Exception as e:
-        logger.error(f"Invalid VM update for '{name}': {e}")
+        logger.error("Invalid VM update for '%s': %s", name, e)
         return jsonify({"error": str(e)}), 400
 
+    # A rename must not collide with another machine
+    if vm.name != name and vm.name in by_name:
+        return jsonify({"error": f"Machine '{vm.name}' already exists"}), 409
+
     # Save the updated instance back into the list
+    _count(_CACHE["stats"], instances[index], -1)
+    _count(_CACHE["stats"], merged)
     instances[index] = merged
-    full_data = {"instances": instances}
+    if vm.name != name:
+        del by_name[name]
+        by_name[vm.name] = index
 
-    # Create backup before writing (safety mechanism)
-    backup_instances_file()
-
-    # Write updated data to disk
-    with INSTANCES_FILE.open("w", encoding="utf-8") as f:
-        json.dump(full_data, f, indent=4)
+    # Record the partial update in the journal
+    _commit([{"op": "upd", "name": name, "patch": payload}])
 
-    logger.info(f"Machine '{name}' updated via API")
+    logger.info("Machine '%s' updated via API", name)
 
     # PUT successful
     return jsonify({"status": "ok"}), 200
 
-@app.delete("/instances/<string:name>")
+@app.delete("/instances/<path:name>")
+@_writes_instances
 def delete_instance(name):
-    # If there is no JSON file, nothing to delete
-    if not INSTANCES_FILE.exists():
+    # Load current instances (if there is no JSON file, nothing to delete)
+    instances = _load_instances()
+    if instances is None:
         return jsonify({"error": "No instances file found"}), 404
 
-    # Load current instances
-    with INSTANCES_FILE.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    # Normalize structure
-    if isinstance(data, dict) and "instances" in data:
-        instances = data["instances"]
-    elif isinstance(data, list):
-        instances = data
-    else:
-        instances = []
-
     # Find machine by name
-    index = None
-    for i, inst in enumerate(instances):
-        if inst.get("name") == name:
-            index = i
-            break
+    by_name = _CACHE["by_name"]
+    index = by_name.get(name)
 
     # If machine doesn't exist — cannot delete
     if index is None:
         return jsonify({"error": f"Machine '{name}' not found"}), 404
 
-    # Remove the machine from the list
+    # Remove the machine from the list and shift the indexes after it
     deleted_instance = instances.pop(index)
-    full_data = {"instances": instances}
-
-    # Backup before writing
-    backup_instances_file()
+    del by_name[name]
+    _count(_CACHE["stats"], deleted_instance, -1)
+    for i in range(index, len(instances)):
+        by_name[instances[i].get("name")] = i
 
-    # Write updated list back to JSON file
-    with INSTANCES_FILE.open("w", encoding="utf-8") as f:
-        json.dump(full_data, f, indent=4)
+    # Record the deletion in the journal
+    _commit([{"op": "del", "name": name}])
 
-    logger.info(f"Machine '{name}' deleted via API")
+    logger.info("Machine '%s' deleted via API", name)
 
     # Successful deletion
     return jsonify({"deleted": deleted_instance}), 200
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000)
+    # Local development only; the container runs the app under gunicorn
+    app.run(host="0.0.0.0", port=5000, threaded=True)
@@ -1,17 +1,31 @@
+import atexit
 import logging
-import os
+import logging.handlers
+import queue
+from pathlib import Path
 
-# Set log file path to logs/app.log relative to current file
-log_path = os.path.join(os.path.dirname(__file__), '..', 'logs', 'app.log')
-os.makedirs(os.path.dirname(log_path), exist_ok=True)
+# Set log file path to logs/app.log relative to current file (resolved once, no '..' left)
+LOG_PATH = Path(__file__).resolve().parent.parent / 'logs' / 'app.log'
+LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-# Configure logging system
-logging.basicConfig(
-    filename=log_path,
-    level=logging.INFO,
-    format='[%(asctime)s] %(levelname)s - %(message)s',
+# File handler does the actual disk writes; delay=True opens the file on the first record
+file_handler = logging.FileHandler(LOG_PATH, delay=True)
+file_handler.setFormatter(logging.Formatter(
+    fmt='[%(asctime)s] %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
-)
+))
+
+# Callers only put records on a queue; a background listener thread writes them
+# to the file, so logging never blocks on disk I/O
+log_queue = queue.SimpleQueue()
+listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
+
+# Configure logging system (replaces logging.basicConfig on the root logger)
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
 # Export logger for use elsewhere
 logger = logging.getLogger(__name__)
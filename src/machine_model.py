@@ -3,11 +3,20 @@
  including base model definition, IP address validation, and custom field validators.
 '''
 
+import re
+
 from pydantic import BaseModel, IPvAnyAddress, field_validator, Field
 
 # Import from typing to restrict field values to specific literal options (like enums)
 from typing import Literal, Optional, Annotated
 
+# Known operating system names; an 'os' value must be one of these, optionally followed by a version
+_ALLOWED_OS = ("linux", "windows", "ubuntu", "centos", "debian", "redhat", "macos", "arch", "fedora", "ios")
+
+# Compiled once: matches a known OS name on its own or followed by a space
+_OS_RE = re.compile(r"^(?:" + "|".join(map(re.escape, _ALLOWED_OS)) + r")(?: |$)")
+_OS_ERROR = f"Invalid operating system. Please choose from: {', '.join(sorted(_ALLOWED_OS))}"
+
 # VMInstance defines the structure and validation rules for the VM's instance. 
 class VMInstance(BaseModel):
     # Name of the VM (must be a non-empty string)
@@ -19,6 +28,7 @@ class VMInstance(BaseModel):
     # Operating system description (can contain a version but must start with a known OS name)
     os: str
 
+    # Status of the VM (pydantic-core rejects anything other than these two values)
     status: Literal["UP", "DOWN"]
     
     # URL check   
@@ -52,23 +62,12 @@ class VMInstance(BaseModel):
         if not isinstance(v, str):
             raise ValueError("Operating system must be a string.")
 
-        allowed_os = {"linux", "windows", "ubuntu", "centos", "debian", "redhat", "macos", "arch", "fedora", "ios"}
-        cleaned = v.strip().lower()
-
         # Check if the input starts with any of the allowed OS names
-        if not any(cleaned == os_name or cleaned.startswith(os_name + ' ') for os_name in allowed_os):
-            raise ValueError(f"Invalid operating system. Please choose from: {', '.join(sorted(allowed_os))}")
+        if not _OS_RE.match(v.strip().lower()):
+            raise ValueError(_OS_ERROR)
 
         return v
 
-    # Validator to ensure the 'status' field is valid
-    @field_validator("status")
-    @classmethod
-    def status_must_be_valid(cls, v):
-        if v not in {"UP", "DOWN"}:
-            raise ValueError("Status must be either 'UP' or 'DOWN'")
-        return v
-   
     # Validator to ensure the 'url' logic is correct for ping/http
     @field_validator("url")
     @classmethod
@@ -82,3 +81,16 @@ class VMInstance(BaseModel):
             raise ValueError("URL must not be provided when check='ping'")
 
         return v
+
+
+# Groups the errors of a ValidationError raised for a list of VMs by list index,
+# as "field: message" strings (just the message for errors on the item itself).
+# Indexes are shifted by offset when the list was a slice of a larger one.
+def errors_by_index(exc, offset=0):
+    errors = {}
+    for err in exc.errors(include_url=False):
+        index, *field = err["loc"]
+        location = ".".join(str(part) for part in field)
+        message = f"{location}: {err['msg']}" if location else err["msg"]
+        errors.setdefault(index + offset, []).append(message)
+    return errors
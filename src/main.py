@@ -1,55 +1,128 @@
 import json
 import os
-import time
-import requests
+import ijson
+import itertools
+import sys
 from logger import logger
-from machine_model import VMInstance
 from colorama import init, Fore, Style
 from storage import load_instances, backup_instances_file
-from monitoring import validate_all_instances, display_statistics
-
-API_BASE_URL = "http://127.0.0.1:5000"
-
-init()
-
-COLOR_RESET = Style.RESET_ALL
-COLOR_GREEN = Fore.GREEN
-COLOR_YELLOW = Fore.YELLOW
-COLOR_RED = Fore.RED
-
-# Checks whether a given machine name exists in the loaded instances
-def check_machine_exists(instances, name):
-    return any(instance.get("name") == name for instance in instances)
+from api_client import API_BASE_URL, SESSION, get_instances, instance_url, machine_exists
+from monitoring import validate_all_instances, display_statistics, pause
+
+# Line editing and history (arrow keys) for every prompt; readline isn't available on Windows
+try:
+    import readline  # noqa: F401
+except ImportError:
+    pass
+
+# Fields shown in each row of display_all_instances(), in column order
+ROW_FIELDS = ("name", "ip", "os", "status", "health", "response_time_ms", "cpu_percent", "memory_percent")
+
+# Number of table rows buffered per stdout write in display_all_instances()
+DISPLAY_BLOCK_ROWS = 256
+
+# Table layout for display_all_instances(), built once at import.
+# STATUS and HEALTH are passed in already colored and padded (see colorize())
+TABLE_HEADER = (
+    f"{'NAME':<12}"
+    f"{'IP':<18}"
+    f"{'OS(ver)':<15}"
+    f"{'STATUS':<10}"
+    f"{'HEALTH':<10}"
+    f"{'RT(ms)':<10}"
+    f"{'CPU%':<8}"
+    f"{'MEM%':<8}"
+)
+TABLE_TOP = f"\n{TABLE_HEADER}\n{'-' * len(TABLE_HEADER)}\n"
+ROW_FORMAT = "{!s:<12}{!s:<18}{!s:<15}{}{}{!s:<10}{!s:<8}{!s:<8}\n".format
+
+# Colors are only used on a terminal. For pipes and log capture the codes are
+# never generated, instead of having colorama wrap stdout and strip every write
+USE_COLOR = sys.stdout.isatty()
+
+if USE_COLOR:
+    init()
+
+COLOR_RESET = Style.RESET_ALL if USE_COLOR else ""
+COLOR_GREEN = Fore.GREEN if USE_COLOR else ""
+COLOR_YELLOW = Fore.YELLOW if USE_COLOR else ""
+COLOR_RED = Fore.RED if USE_COLOR else ""
+
+# Last list indexed by index_instances() and its index. get_instances() hands back
+# the same list object while the server answers 304, so repeated edits/removals
+# only rebuild the index when the machines actually changed
+_INDEX_CACHE = {"instances": None, "index": None}
+
+# Builds a name -> list index map so lookups by name are O(1)
+def index_instances(instances):
+    if instances is _INDEX_CACHE["instances"]:
+        return _INDEX_CACHE["index"]
+    index = {}
+    for i, instance in enumerate(instances):
+        index.setdefault(instance.get("name"), i)
+    _INDEX_CACHE.update(instances=instances, index=index)
+    return index
+
+# Validates machine fields with the VMInstance model
+def validate_machine(data):
+    # Imported here: pydantic is only loaded once the user actually enters a machine
+    from machine_model import VMInstance
+    return VMInstance.model_validate(data)
+
+# The main menu, built once and written with a single call
+INTRO = (
+    "\n🛠️  Simple DevOps Monitoring Tool\n"
+    "-----------------------------------\n"
+    "1. Check if a machine exists\n"
+    "2. Exit\n"
+    "3. Validate all the VMs\n"
+    "4. Add a new machine\n"
+    "5. Display all machines\n"
+    "6. Display VMs statistics\n"
+    "7. Edit an exsisting machine\n"
+    "8. Remove a machine\n"
+)
+
+# Reads one answer from the user with surrounding spaces removed
+def ask(prompt):
+    return input(prompt).strip()
+
+# Asks a y/n question; only "y" or "Y" (surrounding spaces ignored) counts as yes
+def ask_yes(prompt):
+    return ask(prompt) in ("y", "Y")
 
 # Prints the main menu to the user
 def print_intro():
-    print("\n🛠️  Simple DevOps Monitoring Tool")
-    print("-----------------------------------")
-    print("1. Check if a machine exists")
-    print("2. Exit")
-    print("3. Validate all the VMs")
-    print("4. Add a new machine")
-    print("5. Display all machines")
-    print("6. Display VMs statistics")
-    print("7. Edit an exsisting machine")
-    print("8. Remove a machine")
-
-# Handles interactive flow for adding a new VM
-def add_new_machine():
+    sys.stdout.write(INTRO)
+
+# Asks the server whether a machine exists; returns True/False, or None if the server can't be reached.
+# Only that one name is looked up, the machine list itself is never fetched
+def lookup_machine(name):
+    try:
+        return machine_exists(name)
+    except Exception as e:
+        print(f"❌ Failed to check machine on server: {e}\n")
+        logger.error(f"Failed to check machine '{name}' on server: {e}")
+        return None
+
+# Handles interactive flow for adding a new VM.
+# The machine is only staged: it's appended to `staged` (and its name to `staged_names`)
+# and sent to the API together with the others by save_new_machines()
+def add_new_machine(staged_names, staged):
     # Step 0: Collect user input
     print("\n🆕 Add a New Machine")
     print("--------------------")
 
-    name = input("Enter machine name: ").strip()
-    ip = input("Enter IP address: ").strip()
-    os_name = input("Enter operating system: ").strip()
-    status = input("Enter status (UP/DOWN): ").strip().upper()
-    check = input("Enter check type (ping/http) [ping]: ").strip().lower()
+    name = ask("Enter machine name: ")
+    ip = ask("Enter IP address: ")
+    os_name = ask("Enter operating system: ")
+    status = ask("Enter status (UP/DOWN): ").upper()
+    check = ask("Enter check type (ping/http) [ping]: ").lower()
     if check == "":
         check = "ping"
     url = None
     if check == "http":
-        url = input("Enter health-check URL: ").strip()
+        url = ask("Enter health-check URL: ")
 
     data = {
         "name": name,
@@ -64,145 +137,175 @@ def add_new_machine():
 
     # Step 1: Local validation using Pydantic model
     try:
-        vm = VMInstance(**data)
+        vm = validate_machine(data)
     except Exception as e:
         print(f"❌ Invalid machine configuration: {e}\n")
         logger.error(f"Validation failed for new machine: {e}")
-        retry = input("Would you like to try again? (y/n): ").strip().lower()
-        if retry == "y":
+        if ask_yes("Would you like to try again? (y/n): "):
             return "retry"
         else:
             print("🔄 Returning to main menu...\n")
             return "cancel"
 
-    # Step 2: Fetch existing machines from API (instead of local file)
-    try:
-        resp = requests.get(f"{API_BASE_URL}/instances", timeout=3)
-        existing_data = resp.json()
-        instances = existing_data.get("instances", [])
-    except Exception as e:
-        print(f"❌ Failed to fetch machines from server: {e}\n")
-        logger.error(f"Failed to fetch machines from server: {e}")
+    # Step 2: Check for duplicate name (staged in this session or existing on the server)
+    exists = name in staged_names or lookup_machine(name)
+    if exists is None:
         return "cancel"
-
-    # Step 3: Check for duplicate name
-    if any(inst.get("name") == name for inst in instances):
+    if exists:
         print(f"Error: Machine with name '{name}' already exists. Please choose a unique name.\n")
         logger.warning(f"Attempted to add duplicate machine name: '{name}'")
-        retry = input("Would you like to try again? (y/n): ").strip().lower()
-        if retry == "y":
+        if ask_yes("Would you like to try again? (y/n): "):
             return "retry"
         else:
             print("🔄 Returning to main menu...\n")
             return "cancel"
 
-    # Step 4: Ask user to confirm before sending to server
+    # Step 3: Ask user to confirm before staging
     print("\nPlease confirm the machine details:")
-    time.sleep(0.8)
+    pause(0.8)
     print(json.dumps(data, indent=4))
-    time.sleep(1)
-    confirm = input("Save this machine? (y/n): ").strip().lower()
-    if confirm != "y":
-        print("Machine not saved.\n")
-        logger.info(f"User canceled saving machine '{name}'")
+    pause(1)
+    if not ask_yes("Stage this machine? (y/n): "):
+        print("Machine not staged.\n")
+        logger.info(f"User canceled staging machine '{name}'")
         return "cancel"
 
-    # Step 5: Send new machine to API (server will persist to JSON)
+    # Step 4: Stage the machine; it is sent to the API when the user is done adding
+    staged.append(data)
+    staged_names.add(name)
+    print("Machine staged, it will be saved when you return to the main menu.\n")
+    logger.info(f"Machine '{name}' was staged for saving")
+    return "added"
+
+# Names of the staged machines the server refused in a failed batch response:
+# the names that already exist (409) or the items that failed validation (400)
+def rejected_names(resp, staged):
     try:
-        resp = requests.post(f"{API_BASE_URL}/instances", json=data, timeout=3)
-        if resp.status_code == 201:
-            time.sleep(1.5)
-            print("Machine saved successfully!\n")
-            logger.info(f"Machine '{name}' was added successfully via API")
-            return "added"
-        else:
-            print(f"Error: Failed to save machine: {resp.text}\n")
-            logger.error(f"Failed to save machine '{name}' via API: {resp.text}")
-            return "cancel"
-    except Exception as e:
-        print(f"Error: Failed to save machine: {e}\n")
-        logger.error(f"Error during API save for machine '{name}': {e}")
-        return "cancel"
+        body = resp.json()
+    except ValueError:
+        return []
+    if resp.status_code == 409:
+        return body.get("names", [])
+    if resp.status_code == 400:
+        return [staged[err["index"]]["name"] for err in body.get("errors", []) if err.get("index") in range(len(staged))]
+    return []
+
+# Sends all staged machines to the API in a single batch request (one write on the server).
+# The batch is all-or-nothing on the server, so after a failure the user is told which
+# machines were rejected and can save the others, or retry after a network error
+def save_new_machines(staged):
+    while staged:
+        staged_names = [data["name"] for data in staged]
+        print(f"💾 Saving {len(staged)} machine(s)...")
+
+        rejected = []
+        try:
+            resp = SESSION.post(f"{API_BASE_URL}/instances:batch", json={"instances": staged}, timeout=10)
+            if resp.status_code == 201:
+                pause(1.5)
+                print("Machines saved successfully!\n")
+                logger.info(f"Machines {staged_names} were added successfully via API")
+                return
+            print(f"Error: Failed to save machines: {resp.text}\n")
+            logger.error(f"Failed to save machines {staged_names} via API: {resp.text}")
+            rejected = rejected_names(resp, staged)
+        except Exception as e:
+            print(f"Error: Failed to save machines: {e}\n")
+            logger.error(f"Error during API save for machines {staged_names}: {e}")
+
+        if rejected:
+            print(f"Rejected by the server: {', '.join(rejected)}")
+            rest = [data for data in staged if data["name"] not in rejected]
+            if rest and ask_yes(f"Save the other {len(rest)} machine(s)? (y/n): "):
+                staged = rest
+                continue
+        elif ask_yes("Would you like to try again? (y/n): "):
+            continue
+
+        print(f"⚠️  Not saved: {', '.join(staged_names)}\n")
+        logger.warning(f"Staged machines {staged_names} were not saved")
+        return
+
+# Color of each known status / health value (keys are uppercase)
+STATUS_COLORS = {"UP": COLOR_GREEN, "DOWN": COLOR_RED}
+HEALTH_COLORS = {"OK": COLOR_GREEN, "WARN": COLOR_YELLOW, "CRIT": COLOR_RED}
+
+# The same values already wrapped in their color codes, built once at import
+STATUS_COLORED = {value: color + value + COLOR_RESET for value, color in STATUS_COLORS.items()}
+HEALTH_COLORED = {value: color + value + COLOR_RESET for value, color in HEALTH_COLORS.items()}
+
+# Colors a value according to `colors` and pads it to `width` visible characters.
+# The padding goes after the color codes, so the escapes don't count toward the width.
+# Values already in canonical (uppercase) form are a single lookup in `colored`
+def colorize(text: str, colors: dict, colored: dict, width: int = 0) -> str:
+    padding = " " * (width - len(text))
+    cell = colored.get(text)
+    if cell is not None:
+        return cell + padding
+    color = colors.get(text.upper())
+    if color is None:
+        return text + padding
+    return f"{color}{text}{COLOR_RESET}{padding}"
 
 # Displays the UP/DOWN status's color according to their status
-def color_status(status: str) -> str:
-    s = status.upper()
-    if s == "UP":
-        return COLOR_GREEN + status + COLOR_RESET
-    if s == "DOWN":
-        return COLOR_RED + status + COLOR_RESET 
-    return status
+def color_status(status: str, width: int = 0) -> str:
+    return colorize(status, STATUS_COLORS, STATUS_COLORED, width)
 
 # Displays the health status's color according to their status
-def color_health(health: str) -> str:
-    h = health.upper()
-    if h == "OK":
-        return COLOR_GREEN + health + COLOR_RESET
-    if h == "WARN":
-        return COLOR_YELLOW + health + COLOR_RESET
-    if h == "CRIT":
-        return COLOR_RED + health + COLOR_RESET
-    return health
+def color_health(health: str, width: int = 0) -> str:
+    return colorize(health, HEALTH_COLORS, HEALTH_COLORED, width)
+
+# Streams the machines from GET /instances one at a time. The connection goes
+# back to the session's pool once the generator is exhausted or closed
+def stream_instances(timeout=5):
+    with SESSION.get(f"{API_BASE_URL}/instances", stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        yield from ijson.items(response.raw, "instances.item", use_float=True)
 
 # Displays all machines from the configuration file
 def display_all_instances():
     logger.info("User requested to display all machine instances.") 
     try:
         print("📦 Displaying machines...")
-        time.sleep(3)
+        pause(3)
 
-        # Fetch from server instead of local file
+        # Fetch from server instead of local file; rows are parsed and printed
+        # one at a time as the response streams in, never holding the whole list
         try:
-            response = requests.get("http://127.0.0.1:5000/instances")
-            data = response.json()
-            instances = data.get("instances", [])
+            rows = stream_instances()
+            first = next(rows, None)
         except Exception as e:
             print(f"❌ Failed to contact server: {e}")
             return
 
-        if not instances:
+        if first is None:
             print("📭 No machines found.\n")
             return
 
-        header = (
-            f"{'NAME':<12}"
-            f"{'IP':<18}"
-            f"{'OS(ver)':<15}"
-            f"{'STATUS':<10}"
-            f"{'HEALTH':<10}"
-            f"{'RT(ms)':<10}"
-            f"{'CPU%':<8}"
-            f"{'MEM%':<8}"
-        )
-        print()
-        print(header)
-        print("-" * len(header))
-
-        for inst in instances:
-            name = str(inst.get("name"))
-            ip = str(inst.get("ip"))
-            os_name = str(inst.get("os"))
-            status_raw = str(inst.get("status"))
-            health_raw = str(inst.get("health"))
-            rt = str(inst.get("response_time_ms"))
-            cpu = str(inst.get("cpu_percent"))
-            mem = str(inst.get("memory_percent"))
-            
-            status_colored = color_status(status_raw)
-            health_colored = color_health(health_raw)
-
-            print(
-                f"{name:<12}"
-                f"{ip:<18}"
-                f"{os_name:<15}"
-                f"{status_colored:<18}"
-                f"{health_colored:<17}"
-                f"{rt:<10}"
-                f"{cpu:<8}"
-                f"{mem:<8}"
-            )
-
-        print()
+        # Rows are joined and written in blocks rather than printed one by one;
+        # blocks keep memory bounded while the response is still streaming in
+        lines = [TABLE_TOP]
+
+        for inst in itertools.chain([first], rows):
+            name, ip, os_name, status_raw, health_raw, rt, cpu, mem = map(inst.get, ROW_FIELDS)
+
+            lines.append(ROW_FORMAT(
+                name,
+                ip,
+                os_name,
+                color_status(str(status_raw), 10),
+                color_health(str(health_raw), 10),
+                rt,
+                cpu,
+                mem,
+            ))
+            if len(lines) >= DISPLAY_BLOCK_ROWS:
+                sys.stdout.write("".join(lines))
+                lines.clear()
+
+        lines.append("\n")
+        sys.stdout.write("".join(lines))
 
     except FileNotFoundError:
         print("❌ Configuration file not found.")
@@ -213,158 +316,150 @@ def display_all_instances():
 def edit_existing_machine():
     print("\n✏️ Edit Existing Machine")
     print("------------------------")
-    name = input("Enter the machine name to edit: ").strip()
-    time.sleep(1.2)
+    name = ask("Enter the machine name to edit: ")
+    pause(1.2)
 
     # Fetch all instances from API instead of local file access
+    # (a conditional GET: unchanged data isn't downloaded or parsed again)
     try:
-        response = requests.get(f"{API_BASE_URL}/instances", timeout=5)
+        status, instances = get_instances()
     except Exception as e:
         print(f"\n❌ Failed to reach API: {e}")
         logger.error(f"API request failed while editing '{name}': {e}")
         return
 
     # Ensure API returned valid data
-    if response.status_code != 200:
-        print(f"\n❌ Failed to fetch instances from API (status {response.status_code})")
-        logger.error(f"Failed to fetch instances from API, status {response.status_code}")
+    if instances is None:
+        print(f"\n❌ Failed to fetch instances from API (status {status})")
+        logger.error(f"Failed to fetch instances from API, status {status}")
         return
 
-    data = response.json()
-    instances = data.get("instances", [])
-
     # Search for machine by name
-    for inst in instances:
-        if inst.get("name") == name:
-            # Show current machine configuration
-            print("\nCurrent configuration:")
-            time.sleep(0.8)
-            print(json.dumps(inst, indent=4))
-            print("\nPress Enter to keep existing value.\n")
-
-            # Ask user for updated fields (optional inputs)
-            new_ip = input(f"IP address [{inst['ip']}]: ").strip()
-            new_os = input(f"Operating system [{inst['os']}]: ").strip()
-            new_status = input(f"Status (UP/DOWN) [{inst['status']}]: ").strip().upper()
-
-            # Merge updated fields with existing values
-            updated_data = {
-                "name": name,  # name is fixed and not editable
-                "ip": new_ip if new_ip else inst["ip"],
-                "os": new_os if new_os else inst["os"],
-                "status": new_status if new_status else inst["status"]
-            }
-
-            # Validate using Pydantic model before sending to server
-            try:
-                updated_vm = VMInstance(**updated_data)
-            except Exception as e:
-                print(f"\n❌ Invalid configuration: {e}")
-                logger.error(f"Validation failed while editing '{name}': {e}")
-                return
+    idx = index_instances(instances).get(name)
 
-            # Confirm changes before sending PUT request
-            confirm = input("\nSave changes? (y/n): ").strip().lower()
-            if confirm != "y":
-                print("Changes discarded.\n")
-                logger.info(f"User cancelled editing for machine '{name}'")
-                return
+    # Machine not found locally
+    if idx is None:
+        print(f"❌ Machine '{name}' not found.\n")
+        logger.warning(f"Attempted to edit non-existing machine '{name}'")
+        return
 
-            # Send update request to API (PUT)
-            try:
-                put_response = requests.put(
-                    f"{API_BASE_URL}/instances/{name}",
-                    json=updated_data,
-                    timeout=5
-                )
-            except Exception as e:
-                print(f"\n❌ Failed to send update to API: {e}")
-                logger.error(f"API PUT failed for '{name}': {e}")
-                return
+    inst = instances[idx]
+
+    # Show current machine configuration
+    print("\nCurrent configuration:")
+    pause(0.8)
+    print(json.dumps(inst, indent=4))
+    print("\nPress Enter to keep existing value.\n")
+
+    # Ask user for updated fields (optional inputs)
+    new_ip = ask(f"IP address [{inst['ip']}]: ")
+    new_os = ask(f"Operating system [{inst['os']}]: ")
+    new_status = ask(f"Status (UP/DOWN) [{inst['status']}]: ").upper()
+
+    # Merge updated fields with existing values
+    updated_data = {
+        "name": name,  # name is fixed and not editable
+        "ip": new_ip if new_ip else inst["ip"],
+        "os": new_os if new_os else inst["os"],
+        "status": new_status if new_status else inst["status"]
+    }
+
+    # Validate using Pydantic model before sending to server
+    try:
+        updated_vm = validate_machine(updated_data)
+    except Exception as e:
+        print(f"\n❌ Invalid configuration: {e}")
+        logger.error(f"Validation failed while editing '{name}': {e}")
+        return
 
-            # Handle API response codes
-            if put_response.status_code == 200:
-                print("💾 Saving changes...")
-                time.sleep(1.3)
-                print("✅ Machine updated successfully via API.\n")
-                time.sleep(0.8)
-                logger.info(f"Machine '{name}' was updated via API.")
-            elif put_response.status_code == 400:
-                print("\n❌ Update rejected by API: validation error.")
-                logger.error(f"API validation error while updating '{name}': {put_response.text}")
-            elif put_response.status_code == 404:
-                print("\n❌ Update failed: machine not found on server.")
-                logger.warning(f"Machine '{name}' not found on server during update.")
-            else:
-                print(f"\n❌ Update failed with status {put_response.status_code}")
-                logger.error(f"API PUT error for '{name}', status {put_response.status_code}: {put_response.text}")
-
-            return  # End after handling update
+    # Confirm changes before sending PUT request
+    if not ask_yes("\nSave changes? (y/n): "):
+        print("Changes discarded.\n")
+        logger.info(f"User cancelled editing for machine '{name}'")
+        return
 
-    # Machine not found locally
-    print(f"❌ Machine '{name}' not found.\n")
-    logger.warning(f"Attempted to edit non-existing machine '{name}'")
+    # Send update request to API (PUT)
+    try:
+        put_response = SESSION.put(
+            instance_url(name),
+            json=updated_data,
+            timeout=5
+        )
+    except Exception as e:
+        print(f"\n❌ Failed to send update to API: {e}")
+        logger.error(f"API PUT failed for '{name}': {e}")
+        return
+
+    # Handle API response codes
+    if put_response.status_code == 200:
+        print("💾 Saving changes...")
+        pause(1.3)
+        print("✅ Machine updated successfully via API.\n")
+        pause(0.8)
+        logger.info(f"Machine '{name}' was updated via API.")
+    elif put_response.status_code == 400:
+        print("\n❌ Update rejected by API: validation error.")
+        logger.error(f"API validation error while updating '{name}': {put_response.text}")
+    elif put_response.status_code == 404:
+        print("\n❌ Update failed: machine not found on server.")
+        logger.warning(f"Machine '{name}' not found on server during update.")
+    else:
+        print(f"\n❌ Update failed with status {put_response.status_code}")
+        logger.error(f"API PUT error for '{name}', status {put_response.status_code}: {put_response.text}")
     
 # Handles interactive deletion of a machine
 def remove_machine():
     print("\n🗑️  Remove a Machine")
     print("--------------------")
-    name = input("Enter the machine name to remove: ").strip()
+    name = ask("Enter the machine name to remove: ")
 
     if not name:
         print("❌ Machine name is required.\n")
         return
 
     print("🔍 Fetching machines from API...")
-    time.sleep(1)
+    pause(1)
 
     # Fetch all instances from API instead of reading JSON file directly
+    # (a conditional GET: unchanged data isn't downloaded or parsed again)
     try:
-        response = requests.get(f"{API_BASE_URL}/instances", timeout=5)
+        status, instances = get_instances()
     except Exception as e:
         print(f"\n❌ Failed to reach API: {e}")
         logger.error(f"API request failed while trying to remove '{name}': {e}")
         return
 
-    if response.status_code != 200:
-        print(f"\n❌ Failed to fetch instances from API (status {response.status_code})")
-        logger.error(f"Failed to fetch instances from API, status {response.status_code}")
+    if instances is None:
+        print(f"\n❌ Failed to fetch instances from API (status {status})")
+        logger.error(f"Failed to fetch instances from API, status {status}")
         return
 
-    data = response.json()
-    instances = data.get("instances", [])
-
     # Try to find the machine locally for preview before deletion
-    target = None
-    for inst in instances:
-        if inst.get("name") == name:
-            target = inst
-            break
+    idx = index_instances(instances).get(name)
 
-    if not target:
+    if idx is None:
         print(f"❌ Machine '{name}' not found.\n")
         logger.warning(f"Attempted to delete non-existing machine '{name}'")
         return
 
     # Show machine details before deletion
     print("\nMachine found:")
-    print(json.dumps(target, indent=4))
-    time.sleep(0.8)
+    print(json.dumps(instances[idx], indent=4))
+    pause(0.8)
 
     # Ask for confirmation before calling DELETE
-    confirm = input("\nAre you sure you want to delete this machine? (y/n): ").strip().lower()
-    if confirm != "y":
+    if not ask_yes("\nAre you sure you want to delete this machine? (y/n): "):
         print("❎ Deletion canceled.\n")
         logger.info(f"User canceled deletion of machine '{name}'")
         return
 
     print("🗑️  Sending delete request to API...")
-    time.sleep(0.8)
+    pause(0.8)
 
     # Send DELETE request to the API
     try:
-        delete_response = requests.delete(
-            f"{API_BASE_URL}/instances/{name}",
+        delete_response = SESSION.delete(
+            instance_url(name),
             timeout=5
         )
     except Exception as e:
@@ -374,7 +469,7 @@ def remove_machine():
 
     # Handle API response
     if delete_response.status_code == 200:
-        time.sleep(1.3)
+        pause(1.3)
         print("✅ Machine deleted successfully via API.\n")
         logger.info(f"Machine '{name}' was deleted via API.")
     elif delete_response.status_code == 404:
@@ -384,113 +479,113 @@ def remove_machine():
         print(f"\n❌ Delete failed with status {delete_response.status_code}")
         logger.error(f"API DELETE error for '{name}', status {delete_response.status_code}: {delete_response.text}")
 
+# Option 1: Check if machines exist (via API), until the user stops
+def check_machines():
+    checking = True
+
+    while checking:
+        machine_name = ask("Enter machine name to check: ")
+
+        if not machine_name:
+            print("⚠️  Machine name cannot be empty.\n")
+            pause(1)
+            continue
+
+        print("🔍 Checking machine status...")
+        pause(1.5)
+
+        # Ask the server about this one name
+        exists = lookup_machine(machine_name)
+        if exists is None:
+            return
+        if exists:
+            print(f"✅ Machine '{machine_name}' exists.\n")
+            logger.info(f"Machine '{machine_name}' exists")
+        else:
+            print(f"❌ Machine '{machine_name}' does not exist.\n")
+            logger.warning(f"Machine '{machine_name}' does not exist")
+
+        pause(1)
+
+        if not ask_yes("Would you like to check another machine? (y/n): "):
+            print("🔄 Returning to main menu.\n")
+            pause(1.5)
+            checking = False
+
+# Option 2: Exit the tool
+def exit_tool():
+    print("👋 Exiting. Goodbye!")
+    pause(1)
+    return EXIT
+
+# Option 3: Validate all VMs and return to main menu
+def validate_machines():
+    instances = load_instances()
+    validate_all_instances(instances)
+    input("\nValidation complete, press Enter to return to menu...")
+
+# Option 4: Add new machines (loop until user stops), then save them all at once
+def add_machines():
+    staged = []
+    staged_names = set()
+    adding = True
+    try:
+        while adding:
+            result = add_new_machine(staged_names, staged)
+            if result == "retry":
+                continue  # Try adding a machine again
+            if result == "cancel":
+                print("🔄 Returning to main menu...\n")
+                pause(1)
+                adding = False
+                continue
+            if result == "added":
+                if not ask_yes("Would you like to add another machine? (y/n): "):
+                    print("🔄 Returning to main menu...\n")
+                    pause(1)
+                    adding = False
+    except KeyboardInterrupt:
+        # Ctrl-C abandons the machine being entered, not the ones already staged
+        print("\n🔄 Returning to main menu...\n")
+
+    save_new_machines(staged)
+
+# Wraps a menu action so the user presses Enter before the menu is shown again
+def wait_after(action, message):
+    def run():
+        action()
+        input(f"\n{message}, press Enter to return to menu...")
+    return run
+
+# Returned by a menu action to leave the main loop
+EXIT = object()
+
+# Menu choice -> action, built once at import
+MENU = {
+    '1': check_machines,
+    '2': exit_tool,
+    '3': validate_machines,
+    '4': add_machines,
+    '5': wait_after(display_all_instances, "Display complete"),
+    '6': wait_after(display_statistics, "Display complete"),
+    '7': wait_after(edit_existing_machine, "Edit complete"),
+    '8': wait_after(remove_machine, "Deletion complete"),
+}
+
 # Main function that runs the monitoring tool
 def main():
     while True:
         print_intro()
-        choice = input("Choose an option (from 1-8): ").strip()
-
-        # Option 1: Check if a machine exists (via API)
-        if choice == '1':
-            checking = True
-
-            while checking:
-                machine_name = input("Enter machine name to check: ").strip()
-
-                if not machine_name:
-                    print("⚠️  Machine name cannot be empty.\n")
-                    time.sleep(1)
-                    continue
-
-                print("🔍 Checking machine status...")
-                time.sleep(1.5)
-
-                # Fetch current instances list from API instead of reading JSON directly
-                try:
-                    response = requests.get(f"{API_BASE_URL}/instances", timeout=5)
-                except Exception as e:
-                    print(f"\n❌ Failed to reach API: {e}")
-                    logger.error(f"API request failed while checking machine '{machine_name}': {e}")
-                    break
-
-                if response.status_code != 200:
-                    print(f"\n❌ Failed to fetch instances from API (status {response.status_code})")
-                    logger.error(f"Failed to fetch instances from API while checking '{machine_name}', status {response.status_code}")
-                    break
-
-                data = response.json()
-                instances = data.get("instances", [])
-
-                # Use helper function to check if machine exists in the list from API
-                if check_machine_exists(instances, machine_name):
-                    print(f"✅ Machine '{machine_name}' exists.\n")
-                    logger.info(f"Machine '{machine_name}' exists")
-                else:
-                    print(f"❌ Machine '{machine_name}' does not exist.\n")
-                    logger.warning(f"Machine '{machine_name}' does not exist")
-
-                time.sleep(1)
-
-                again = input("Would you like to check another machine? (y/n): ").strip().lower()
-                if again != 'y':
-                    print("🔄 Returning to main menu.\n")
-                    time.sleep(1.5)
-                    checking = False
-                    
-        # Option 2: Exit the tool
-        elif choice == '2':
-            print("👋 Exiting. Goodbye!")
-            time.sleep(1)
-            break
-
-        # Option 3: Validate all VMs and return to main menu
-        elif choice == '3':
-            instances = load_instances()
-            validate_all_instances(instances)
-            input("\nValidation complete, press Enter to return to menu...")
-
-        # Option 4: Add new machines (loop until user stops)
-        elif choice == '4':
-            adding = True
-            while adding:
-                result = add_new_machine()
-                if result == "retry":
-                    continue  # Try adding a machine again
-                if result == "cancel":
-                    print("🔄 Returning to main menu...\n")
-                    time.sleep(1)
-                    adding = False
-                    continue
-                if result == "added":
-                    again = input("Would you like to add another machine? (y/n): ").strip().lower()
-                    if again != 'y':
-                        print("🔄 Returning to main menu...\n")
-                        time.sleep(1)
-                        adding = False
-       
-        # Option 5: Display all machines
-        elif choice == '5':
-            display_all_instances()
-            input("\nDisplay complete, press Enter to return to menu...")
-        
-        # Option 6: Display statistics summary
-        elif choice == '6':
-            display_statistics()
-            input("\nDisplay complete, press Enter to return to menu...")
-        
-        # Option 7: Edit an existing machine
-        elif choice == '7':
-            edit_existing_machine()
-            input("\nEdit complete, press Enter to return to menu...")
-        
-        # Option 8: Remove a machine
-        elif choice == '8':
-            remove_machine()
-            input("\nDeletion complete, press Enter to return to menu...")
+        choice = ask("Choose an option (from 1-8): ")
 
-        else:
+        action = MENU.get(choice)
+        if action is None:
             print("❗ Invalid choice. Please enter an option between 1-8.\n")
-            time.sleep(1)
+            pause(1)
+            continue
+
+        if action() is EXIT:
+            break
 
 # Entry point
 if __name__ == "__main__":
@@ -1,147 +1,417 @@
+import itertools
+import os
+import select
+import socket
+import struct
 import time
-import subprocess
-import platform
-from collections import Counter
+import sys
+import threading
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from logger import logger
-from machine_model import VMInstance
-
-def get_instances_from_server():
+from api_client import API_BASE_URL, SESSION
+
+# pydantic (via machine_model) is only imported when something is validated,
+# so menu options that never validate don't pay its import cost at startup
+if TYPE_CHECKING:
+    from machine_model import VMInstance
+
+# The menus used to sleep between steps to look busy; that is now opt-in (MONITOR_SLOW_UX=1)
+SLOW_UX = os.environ.get("MONITOR_SLOW_UX") == "1"
+
+# Sleeps for the given number of seconds, only when slow UX is enabled
+def pause(seconds):
+    if SLOW_UX:
+        # Show everything written so far before waiting
+        sys.stdout.flush()
+        time.sleep(seconds)
+
+# Response times (ms) above which a check that succeeded is reported as WARN
+PING_SLOW_MS = 250
+HTTP_SLOW_MS = 400
+
+# Upper bound on health checks (ping/HTTP) running at the same time
+MAX_CHECK_WORKERS = 32
+
+# Seconds a probe result is reused for the same (method, target)
+PROBE_TTL = 5.0
+
+# Finished probes as (method, target) -> (monotonic time, result), and probes still
+# running as (method, target) -> Future; both guarded by _PROBE_LOCK
+_PROBE_CACHE = {}
+_PROBES_RUNNING = {}
+_PROBE_LOCK = threading.Lock()
+
+# Session shared by all HTTP health checks of a run (and across runs).
+# Its pool holds one connection per check worker, so concurrent checks reuse
+# kept-alive sockets instead of each opening a new one. No retries here:
+# a retried check would hide failures and skew the measured response time.
+CHECK_SESSION = requests.Session()
+_CHECK_ADAPTER = HTTPAdapter(pool_connections=MAX_CHECK_WORKERS, pool_maxsize=MAX_CHECK_WORKERS, max_retries=0)
+CHECK_SESSION.mount("http://", _CHECK_ADAPTER)
+CHECK_SESSION.mount("https://", _CHECK_ADAPTER)
+
+# Validator for a whole list of VM dicts in a single pydantic call, built on first use
+@lru_cache(maxsize=None)
+def _vm_list_adapter():
+    from pydantic import TypeAdapter
+    from machine_model import VMInstance
+    return TypeAdapter(list[VMInstance])
+
+def get_stats_from_server():
     try:
-        response = requests.get("http://127.0.0.1:5000/instances", timeout=3)
-        data = response.json()
-        instances = data.get("instances", [])
-        if not isinstance(instances, list):
-            return []
-        return instances
+        response = SESSION.get(f"{API_BASE_URL}/stats", timeout=3)
+        data = orjson.loads(response.content)
+        if not isinstance(data, dict):
+            return {}
+        return data
     except Exception as e:
-        print(f"❌ Failed to contact server for instances: {e}")
-        logger.error(f"Failed to fetch instances from server: {e}")
-        return []
+        print(f"❌ Failed to contact server for statistics: {e}")
+        logger.error(f"Failed to fetch statistics from server: {e}")
+        return {}
+
+# Resolved once from sys.platform; the platform module isn't needed (or imported) for this
+IS_WINDOWS = sys.platform == "win32"
+
+# Payload of the echo requests sent by the in-process ping
+_ICMP_PAYLOAD = b"simple-monitoring-tool"
+
+# Sequence numbers of echo requests; unique across the concurrent check threads
+_ICMP_SEQ = itertools.count(1)
+
+
+def _icmp_checksum(data):
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def ping_many(ips, timeout=1):
+    """
+    Ping several IPv4 addresses at once from a single ICMP socket, without starting
+    ping processes: every echo request is sent up front, then replies are collected
+    until all hosts have answered or the timeout expires, so the whole batch takes
+    about as long as the slowest host.
+    Uses an unprivileged datagram ICMP socket when the OS allows it, otherwise a raw
+    socket (root / CAP_NET_RAW).
+    Returns {ip: (success, elapsed_ms)}, or None if no ICMP socket can be opened
+    (always on Windows, which pings through IcmpSendEcho instead).
+    """
+    if IS_WINDOWS:
+        return None
+    for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+            break
+        except OSError:
+            continue
+    else:
+        return None
+
+    results = {}
+    # Outstanding requests: sequence number -> (ip, send time)
+    pending = {}
+
+    with sock:
+        # Datagram sockets replace the identifier with their own and only see their replies;
+        # raw sockets see every ICMP packet, so replies are matched on identifier + sequence
+        ident = os.getpid() & 0xFFFF
+        for ip in dict.fromkeys(ips):
+            seq = next(_ICMP_SEQ) & 0xFFFF
+            checksum = _icmp_checksum(struct.pack("!BBHHH", 8, 0, 0, ident, seq) + _ICMP_PAYLOAD)
+            sent = time.perf_counter()
+            try:
+                sock.sendto(struct.pack("!BBHHH", 8, 0, checksum, ident, seq) + _ICMP_PAYLOAD, (ip, 0))
+            except OSError:
+                results[ip] = (False, 0)
+                continue
+            pending[seq] = (ip, sent)
+
+        deadline = time.perf_counter() + timeout
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not select.select([sock], [], [], remaining)[0]:
+                break
+            data, (source, _) = sock.recvfrom(1024)
+            received = time.perf_counter()
+            # Raw sockets (and datagram sockets on macOS) deliver the IP header too
+            if data and data[0] >> 4 == 4:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8 or data[0] != 0:
+                continue
+            reply_ident, reply_seq = struct.unpack("!HH", data[4:8])
+            request = pending.get(reply_seq)
+            if request is None or request[0] != source:
+                continue
+            if sock_type == socket.SOCK_RAW and reply_ident != ident:
+                continue
+            del pending[reply_seq]
+            results[source] = (True, int((received - request[1]) * 1000))
+
+    # Whatever is still pending never answered
+    now = time.perf_counter()
+    for ip, sent in pending.values():
+        results[ip] = (False, int((now - sent) * 1000))
+    return results
+
+
+def _icmp_echo(ip, timeout):
+    """
+    Ping one IPv4 address from this process (see ping_many()).
+    Returns True/False (reply / no reply), or None if no ICMP socket can be opened.
+    """
+    results = ping_many([ip], timeout)
+    return None if results is None else results[ip][0]
+
+
+def prefetch_pings(ips, timeout=1):
+    """
+    Ping all the given addresses in one ping_many() batch and store the results in
+    the probe cache, so the ping checks that follow reuse them instead of each
+    sending their own echo request. IPv6 addresses are left to run_ping().
+    """
+    results = ping_many([ip for ip in ips if ":" not in ip], timeout)
+    if not results:
+        return
+    now = time.monotonic()
+    with _PROBE_LOCK:
+        for ip, result in results.items():
+            _PROBE_CACHE[("ping", ip)] = (now, result)
+
+
+# IcmpSendEcho and friends from Iphlpapi.dll, with their argument types, loaded on first use
+@lru_cache(maxsize=None)
+def _iphlpapi():
+    import ctypes
+    from ctypes import wintypes
+
+    dll = ctypes.WinDLL("Iphlpapi.dll")
+    dll.IcmpCreateFile.restype = wintypes.HANDLE
+    dll.IcmpCloseHandle.argtypes = [wintypes.HANDLE]
+    dll.IcmpSendEcho.restype = wintypes.DWORD
+    dll.IcmpSendEcho.argtypes = [
+        wintypes.HANDLE, wintypes.DWORD, ctypes.c_void_p, wintypes.WORD,
+        ctypes.c_void_p, ctypes.c_void_p, wintypes.DWORD, wintypes.DWORD,
+    ]
+    return dll
+
+
+def _icmp_echo_windows(ip, timeout):
+    """
+    Windows counterpart of _icmp_echo(): IcmpSendEcho needs no privileges and no ping.exe.
+    Returns True/False (reply / no reply), or None if the ICMP API can't be used.
+    """
+    import ctypes
+
+    try:
+        dll = _iphlpapi()
+    except OSError:
+        return None
+    handle = dll.IcmpCreateFile()
+    if handle is None or handle == ctypes.c_void_p(-1).value:
+        return None
+    try:
+        # IPAddr holds the address bytes in network order
+        address = struct.unpack("=I", socket.inet_aton(ip))[0]
+        reply = ctypes.create_string_buffer(256)
+        count = dll.IcmpSendEcho(
+            handle, address, _ICMP_PAYLOAD, len(_ICMP_PAYLOAD),
+            None, reply, len(reply), int(timeout * 1000),
+        )
+        # ICMP_ECHO_REPLY starts with Address and Status; status 0 is IP_SUCCESS
+        return count > 0 and struct.unpack_from("=II", reply.raw)[1] == 0
+    finally:
+        dll.IcmpCloseHandle(handle)
+
 
 def run_ping(ip, timeout=1):
-    system = platform.system().lower()
     ip_str = str(ip)
 
-    if system == "windows":
-        cmd = ["ping", "-n", "1", "-w", str(timeout * 1000), ip_str]
-    else:
-        cmd = ["ping", "-c", "1", "-W", str(timeout), ip_str]
+    start = time.perf_counter()
 
-    start = time.time()
-    completed = subprocess.run(
-        cmd,
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
-    elapsed_ms = int((time.time() - start) * 1000)
-    success = completed.returncode == 0
+    # IPv4 is pinged from this process; the ping binary is only started for IPv6
+    # or when the OS doesn't let us open an ICMP socket
+    success = None
+    if ":" not in ip_str:
+        if IS_WINDOWS:
+            success = _icmp_echo_windows(ip_str, timeout)
+        else:
+            success = _icmp_echo(ip_str, timeout)
+
+    if success is None:
+        # Only imported on this fallback path; in-process pings don't need it
+        import subprocess
+
+        if IS_WINDOWS:
+            cmd = ["ping", "-n", "1", "-w", str(timeout * 1000), ip_str]
+        else:
+            cmd = ["ping", "-c", "1", "-W", str(timeout), ip_str]
+
+        completed = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        success = completed.returncode == 0
+
+    elapsed_ms = int((time.perf_counter() - start) * 1000)
 
     return success, elapsed_ms
 
 
 def run_http(url, timeout=2):
     """
-    Send an HTTP GET request to the given URL.
+    Send an HTTP HEAD request to the given URL, falling back to GET for servers
+    that don't allow HEAD. Only the status line and headers are read: no body is transferred.
     Returns (success: bool, status_code: Optional[int], elapsed_ms: int).
     """
-    start = time.time()
+    start = time.perf_counter()
 
     try:
-        response = requests.get(url, timeout=timeout)
-        elapsed_ms = int((time.time() - start) * 1000)
+        response = CHECK_SESSION.head(url, timeout=timeout, allow_redirects=True)
+        if response.status_code in (405, 501):
+            with CHECK_SESSION.get(url, timeout=timeout, stream=True) as response:
+                pass
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
         return True, response.status_code, elapsed_ms
     except requests.RequestException:
-        elapsed_ms = int((time.time() - start) * 1000)
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
         return False, None, elapsed_ms
 
 
-def monitor_vm(vm: VMInstance):
+def probe(method, target, run):
+    """
+    Return run(target), sharing it between every check of the same (method, target):
+    a result younger than PROBE_TTL is reused, and a check that finds the same probe
+    already running waits for it instead of sending another one (single flight).
+    Exceptions are passed on to the waiting checks but are not cached.
     """
-    Runs health check for a single VM.
+    key = (method, target)
+    with _PROBE_LOCK:
+        cached = _PROBE_CACHE.get(key)
+        if cached is not None and time.monotonic() - cached[0] < PROBE_TTL:
+            return cached[1]
+        running = _PROBES_RUNNING.get(key)
+        if running is None:
+            running = _PROBES_RUNNING[key] = Future()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        return running.result()
+
+    try:
+        result = run(target)
+    except BaseException as e:
+        with _PROBE_LOCK:
+            del _PROBES_RUNNING[key]
+        running.set_exception(e)
+        raise
+
+    with _PROBE_LOCK:
+        _PROBE_CACHE[key] = (time.monotonic(), result)
+        del _PROBES_RUNNING[key]
+    running.set_result(result)
+    return result
+
+
+# Each check below returns (health, reason, response_time_ms, label for the report)
+
+def _check_ping(vm):
+    # Real ICMP ping to the configured IP
+    success, rt = probe("ping", str(vm.ip), run_ping)
+    label = f"[REAL] PING {vm.ip}"
+
+    if not success:
+        return "CRIT", "Ping failed", rt, label
+    if rt > PING_SLOW_MS:
+        return "WARN", "High latency", rt, label
+    return "OK", "Healthy", rt, label
+
+
+def _check_http(vm):
+    # Real HTTP request to the configured URL
+    url = vm.url
+    label = f"[REAL] HTTP GET {url}"
+
+    if not url:
+        # Configuration error: HTTP check without URL
+        return "CRIT", "Missing URL for HTTP check", 0, label
+
+    success, status_code, rt = probe("http", url, run_http)
+
+    if not success:
+        return "CRIT", "HTTP request failed", rt, label
+    if status_code >= 500:
+        return "CRIT", f"HTTP {status_code}", rt, label
+    if status_code >= 400 or rt > HTTP_SLOW_MS:
+        # Client error or slow response → treat as WARN
+        return "WARN", f"HTTP {status_code} or slow response", rt, label
+    return "OK", "Healthy", rt, label
+
+
+def _check_unsupported(vm):
+    # In the real mode, only 'ping' and 'http' are fully supported.
+    # Any other method is marked as WARN without running a simulated check.
+    return "WARN", "Unsupported check method", None, f"[NO-CHECK] METHOD '{vm.check}'"
+
+
+# Check implementation for each VMInstance.check value; anything else is unsupported
+CHECKS = {
+    "ping": _check_ping,
+    "http": _check_http,
+}
+
+
+def check_vm(vm: "VMInstance"):
+    """
+    Runs health check for a single VM without printing anything,
+    so several checks can run at once in worker threads.
 
     Steps:
     1. Read CPU and memory metrics from the VM instance (assumed to come from an external source).
-    2. For 'ping': run a real ICMP ping and decide health based on success + latency.
-    3. For 'http': send a real HTTP request and decide health based on status code + latency.
-    4. For unsupported methods: mark as WARN without any simulated checks.
-    5. Print a human-readable summary and return a dict with all metrics.
+    2. Run the check registered in CHECKS for vm.check:
+       'ping' decides health based on success + latency of a real ICMP ping,
+       'http' on status code + latency of a real HTTP request.
+    3. For unsupported methods: mark as WARN without any simulated checks.
+    4. Return (a dict with all metrics, the human-readable summary).
     """
-    print(f"🧪 Running health check for '{vm.name}'...")
-    time.sleep(0.5)
+    pause(0.5)
 
     # CPU and memory metrics are not simulated here.
-    # They are used only if provided on the VMInstance (from an external monitoring source).
-    cpu_percent = getattr(vm, "cpu_percent", None)
-    memory_percent = getattr(vm, "memory_percent", None)
-
-    response_time_ms = None
-    health = "OK"
-    reason = "Healthy"
-    method = vm.check
+    # They come from the VMInstance fields (filled by an external monitoring source, 0 by default).
+    cpu_percent = vm.cpu_percent
+    memory_percent = vm.memory_percent
 
     # Network check based on method type
-    if method == "ping":
-        # Real ICMP ping to the configured IP
-        success, rt = run_ping(vm.ip)
-        response_time_ms = rt
-
-        if not success:
-            health = "CRIT"
-            reason = "Ping failed"
-        elif rt > 250:
-            health = "WARN"
-            reason = "High latency"
-
-    elif method == "http":
-        # Real HTTP GET to the configured URL
-        url = getattr(vm, "url", None)
-
-        if not url:
-            # Configuration error: HTTP check without URL
-            health = "CRIT"
-            reason = "Missing URL for HTTP check"
-            response_time_ms = 0
-        else:
-            success, status_code, rt = run_http(url)
-            response_time_ms = rt
-
-            if not success:
-                health = "CRIT"
-                reason = "HTTP request failed"
-            elif status_code >= 500:
-                health = "CRIT"
-                reason = f"HTTP {status_code}"
-            elif status_code >= 400 or rt > 400:
-                # Client error or slow response → treat as WARN
-                health = "WARN"
-                reason = f"HTTP {status_code} or slow response"
-
-    else:
-        # In the real mode, only 'ping' and 'http' are fully supported.
-        # Any other method is marked as WARN without running a simulated check.
-        health = "WARN"
-        reason = "Unsupported check method"
-        response_time_ms = None
+    method = vm.check
+    check = CHECKS.get(method, _check_unsupported)
+    health, reason, response_time_ms, label = check(vm)
 
     # Prepare display values for CPU/MEM (external-only metrics)
     cpu_display = f"{cpu_percent}%" if isinstance(cpu_percent, (int, float)) else "N/A"
     mem_display = f"{memory_percent}%" if isinstance(memory_percent, (int, float)) else "N/A"
 
-    # Human-readable output for the current VM
-    if method == "ping":
-        print(f"   [REAL] PING {vm.ip} ... {health}")
-    elif method == "http":
-        target = getattr(vm, "url", "(no URL)")
-        print(f"   [REAL] HTTP GET {target} ... {health}")
-    else:
-        print(f"   [NO-CHECK] METHOD '{method}' ... {health}")
+    # Human-readable output for the current VM, as one block
+    check_line = f"   {label} ... {health}"
 
-    print(f"   Reason: {reason}")
-    print(f"   RT={response_time_ms} ms | CPU={cpu_display} | MEM={mem_display}\n")
+    report = (
+        f"🧪 Running health check for '{vm.name}'...\n"
+        f"{check_line}\n"
+        f"   Reason: {reason}\n"
+        f"   RT={response_time_ms} ms | CPU={cpu_display} | MEM={mem_display}\n\n"
+    )
 
     # Structured result for aggregation in validate_all_instances()
-    return {
+    result = {
         "name": vm.name,
         "status": vm.status,
         "health": health,
@@ -150,43 +420,74 @@ def monitor_vm(vm: VMInstance):
         "cpu_percent": cpu_percent,
         "memory_percent": memory_percent,
     }
+    return result, report
+
+
+def validate_batch(instances):
+    """
+    Validate all VM dictionaries in one TypeAdapter pass.
+    Returns (vms, errors): vms maps list index -> VMInstance for the valid entries,
+    errors maps list index -> "field: message" strings for the invalid ones.
+    """
+    from pydantic import ValidationError
+    from machine_model import errors_by_index
+
+    validate = _vm_list_adapter().validate_python
+    try:
+        return dict(enumerate(validate(instances))), {}
+    except ValidationError as e:
+        errors = errors_by_index(e)
+
+    # The valid entries pass on their own: validate just those in a second batch
+    good = [i for i in range(len(instances)) if i not in errors]
+    vms = dict(zip(good, validate([instances[i] for i in good])))
+    return vms, errors
 
 
 def validate_all_instances(instances):
     """
     Validate all VM dictionaries using VMInstance.
-    For each valid VM, run monitor_vm and collect the result.
+    For each valid VM, run check_vm (concurrently) and collect the result.
     One bad VM or one monitoring error does NOT stop the whole loop.
     At the end, only report machines that did NOT pass the health check.
     """
     logger.info("🔍 Started validating all VM instances from JSON.")
     print("\n🔍 Validating machine configurations...")
-    time.sleep(1.0)
+    pause(1.0)
 
     results = []
+    vms, errors = validate_batch(instances)
 
-    for idx, data in enumerate(instances, 1):
-        try:
+    # All ping targets are pinged together first; their checks then read the result from the probe cache
+    prefetch_pings({str(vm.ip) for vm in vms.values() if vm.check == "ping"})
+
+    # Ping/HTTP checks are I/O bound: run them all concurrently, so the run takes
+    # about as long as the slowest check instead of the sum of all of them.
+    # Reports are printed in list order below as each one becomes available.
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_CHECK_WORKERS, len(vms)))) as executor:
+        checks = {i: executor.submit(check_vm, vm) for i, vm in vms.items()}
+
+        for idx in range(1, len(instances) + 1):
             print(f"⏳ Validating VM #{idx}...")
-            time.sleep(0.6)
-            vm = VMInstance(**data)
+            pause(0.6)
+            vm = vms.get(idx - 1)
+            if vm is None:
+                error = "; ".join(errors[idx - 1])
+                sys.stdout.write(f"❌ VM #{idx} failed validation:\n   Error: {error}\n\n")
+                logger.error(f"Machine #{idx} is invalid: {error}")
+                pause(0.4)
+                continue
             logger.info(f"Machine '{vm.name}' is valid")
-        except Exception as e:
-            print(f"❌ VM #{idx} failed validation:")
-            print(f"   Error: {e}\n")
-            logger.error(f"Machine #{idx} is invalid: {e}")
-            time.sleep(0.4)
-            continue
 
-        try:
-            result = monitor_vm(vm)
-            results.append(result)
-        except Exception as e:
-            print(f"❌ Monitoring failed for VM #{idx} ('{vm.name}'):")
-            print(f"   Error: {e}\n")
-            logger.error(f"Monitoring failed for machine '{vm.name}': {e}")
-            time.sleep(0.4)
-            continue
+            try:
+                result, report = checks[idx - 1].result()
+                sys.stdout.write(report)
+                results.append(result)
+            except Exception as e:
+                sys.stdout.write(f"❌ Monitoring failed for VM #{idx} ('{vm.name}'):\n   Error: {e}\n\n")
+                logger.error(f"Monitoring failed for machine '{vm.name}': {e}")
+                pause(0.4)
+                continue
 
     print("✔️  Validation process completed.\n")
 
@@ -198,10 +499,11 @@ def validate_all_instances(instances):
     failing = [r for r in results if r["health"] != "OK"]
 
     if failing:
-        print("⚠️  The following machines did NOT pass the health check:")
-        for r in failing:
-            print(f"   - {r['name']} (status={r['status']}, health={r['health']})")
-        print()
+        sys.stdout.write(
+            "⚠️  The following machines did NOT pass the health check:\n"
+            + "".join(f"   - {r['name']} (status={r['status']}, health={r['health']})\n" for r in failing)
+            + "\n"
+        )
         logger.info(
             f"Health failures in run: {[r['name'] for r in failing]}"
         )
@@ -218,73 +520,49 @@ def display_statistics():
     """
     logger.info("User requested VM statistics.")
     print(" 📊 Gathering VM statistics...")
-    time.sleep(1.5)
-    instances = get_instances_from_server()
-
+    pause(1.5)
+    stats = get_stats_from_server()
 
-    if not instances:
+    if not stats or not stats.get("total"):
         print("📭 No machines found.\n")
         return
 
-    total = len(instances)
-    up = sum(1 for inst in instances if inst.get("status") == "UP")
-    down = total - up
-
-    # Count OS usage
-    os_counter = Counter()
-    for inst in instances:
-        os_value = inst.get("os", "unknown").strip().split()[0].lower()
-        os_counter[os_value] += 1
-    
-    # Count health status distribution
-    health_counter = Counter()
-    for inst in instances:
-        health_value = str(inst.get("health", "UNKNOWN")).upper()
-        health_counter[health_value] += 1
-
-    # Collect numeric metrics for averages
-    rts = [
-        inst.get("response_time_ms")
-        for inst in instances
-        if isinstance(inst.get("response_time_ms"), (int, float))
-    ]
-    cpus = [
-        inst.get("cpu_percent")
-        for inst in instances
-        if isinstance(inst.get("cpu_percent"), (int, float))
-    ]
-    mems = [
-        inst.get("memory_percent")
-        for inst in instances
-        if isinstance(inst.get("memory_percent"), (int, float))
-    ]
-
-    avg_rt = sum(rts) / len(rts) if rts else 0
-    avg_cpu = sum(cpus) / len(cpus) if cpus else 0
-    avg_mem = sum(mems) / len(mems) if mems else 0
-
-    print("\n📊 VM Summary:")
-    print(f"- Total machines: {total}")
-    print(f"- Machines UP  : {up}")
-    print(f"- Machines DOWN: {down}\n")
-    time.sleep(1)
-    print("-----------------------------")
-    time.sleep(0.5)
-    print("🖥️  By OS:")
-    for os_name, count in os_counter.items():
-        print(f"• {os_name.capitalize()}: {count}")
-    time.sleep(1)
-    print("-----------------------------")
-    time.sleep(0.5)
-    print("\n❤️  Health status:")
-    for health_value, count in health_counter.items():
-        print(f"• {health_value}: {count}")
-    time.sleep(1)
-    print("-----------------------------")
-    time.sleep(0.5)
-    print("\n📈 Performance (averages):")
-    print(f"- Avg response time: {avg_rt:.1f} ms")
-    print(f"- Avg CPU usage    : {avg_cpu:.1f} %")
-    print(f"- Avg memory usage : {avg_mem:.1f} %")
-    time.sleep(1.5)
-    print("\n")
+    # Aggregates are maintained by the server on every add/edit/remove
+    total = stats["total"]
+    up = stats["up"]
+    down = stats["down"]
+    os_counter = stats.get("os", {})
+    health_counter = stats.get("health", {})
+    averages = stats.get("averages", {})
+
+    avg_rt = averages.get("response_time_ms", 0)
+    avg_cpu = averages.get("cpu_percent", 0)
+    avg_mem = averages.get("memory_percent", 0)
+
+    # Each section is written with a single call rather than a print per line
+    out = sys.stdout.write
+    out(
+        "\n📊 VM Summary:\n"
+        f"- Total machines: {total}\n"
+        f"- Machines UP  : {up}\n"
+        f"- Machines DOWN: {down}\n\n"
+    )
+    pause(1)
+    out("-----------------------------\n")
+    pause(0.5)
+    out("🖥️  By OS:\n" + "".join(f"• {os_name.capitalize()}: {count}\n" for os_name, count in os_counter.items()))
+    pause(1)
+    out("-----------------------------\n")
+    pause(0.5)
+    out("\n❤️  Health status:\n" + "".join(f"• {health_value}: {count}\n" for health_value, count in health_counter.items()))
+    pause(1)
+    out("-----------------------------\n")
+    pause(0.5)
+    out(
+        "\n📈 Performance (averages):\n"
+        f"- Avg response time: {avg_rt:.1f} ms\n"
+        f"- Avg CPU usage    : {avg_cpu:.1f} %\n"
+        f"- Avg memory usage : {avg_mem:.1f} %\n"
+    )
+    pause(1.5)
+    out("\n\n")
@@ -1,21 +1,127 @@
-import json
 import os
-import shutil
+import orjson
 from logger import logger
 
-# Creates a backup copy of the instances.json file
+# Paths of the config files, resolved once at import
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs')
+INSTANCES_PATH = os.path.join(CONFIG_DIR, 'instances.json')
+JOURNAL_PATH = os.path.join(CONFIG_DIR, 'instances.log')
+BACKUP_PATH = os.path.join(CONFIG_DIR, 'instances_backup.json')
+
+# Creates a backup of the instances.json file.
+# The backup is a hardlink to the current file (no data copied): the API always
+# replaces instances.json with a new file via os.replace, so the linked inode keeps
+# the old content. Falls back to a full copy where hardlinks aren't supported.
 def backup_instances_file():
     try:
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'configs', 'instances.json')
-        backup_path = os.path.join(os.path.dirname(__file__), '..', 'configs', 'instances_backup.json')
-        shutil.copyfile(config_path, backup_path)
+        tmp_path = BACKUP_PATH + '.tmp'
+        try:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            os.link(INSTANCES_PATH, tmp_path)
+            # Swap the new link in atomically so a backup always exists
+            os.replace(tmp_path, BACKUP_PATH)
+        except OSError as e:
+            if isinstance(e, FileNotFoundError):
+                raise
+            # Only needed where hardlinks aren't supported, so imported on demand
+            import shutil
+            shutil.copyfile(INSTANCES_PATH, BACKUP_PATH)
         logger.info("Backup created successfully.")
     except Exception as e:
         logger.warning(f"Failed to create backup: {e}")
 
-# Loads instance data from the JSON configuration file
+# Last parsed instances list, keyed on the (mtime, size) of the file and the journal
+_cache = {"key": None, "data": None}
+
+# Returns (mtime_ns, size) of a file, or None if it doesn't exist
+def _file_key(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+# Reads a whole file with raw os.read calls on a plain fd, skipping the io buffering layer
+def _read_bytes(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        while chunk := os.read(fd, 1 << 16):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b"".join(chunks)
+
+# Loads instance data from the JSON configuration file.
+# The result is memoized: the files are only re-read when the config file or
+# the journal changed on disk since the previous call.
 def load_instances():
-    path = os.path.join(os.path.dirname(__file__), '..', 'configs', 'instances.json')
-    with open(path, 'r') as file:
-        data = json.load(file)
-    return data.get('instances', [])
+    key = (_file_key(INSTANCES_PATH), _file_key(JOURNAL_PATH))
+    if key[0] is not None and key == _cache["key"]:
+        return _cache["data"]
+
+    data = orjson.loads(_read_bytes(INSTANCES_PATH))
+    instances = data.get('instances', [])
+
+    # Include changes the API has journaled but not yet compacted into the file
+    replay_journal(instances, JOURNAL_PATH, data.get('seq', 0))
+
+    _cache.update(key=key, data=instances)
+    return instances
+
+# Applies the mutation journal (one JSON record per line, written by the API)
+# on top of the snapshot list, in place.
+# Every record carries a sequence number and the snapshot stores the last one folded
+# into it (`after_seq`). Records at or below it were already compacted and are skipped:
+# a crash between writing the snapshot and truncating the journal leaves such records behind.
+# Returns (number of records applied, highest sequence number seen).
+def replay_journal(instances, journal_path, after_seq=0):
+    if not os.path.exists(journal_path):
+        return 0, after_seq
+
+    by_name = {}
+    for i, inst in enumerate(instances):
+        by_name.setdefault(inst.get("name"), i)
+
+    applied = 0
+    last_seq = after_seq
+    with open(journal_path, 'rb') as file:
+        for line in file:
+            try:
+                record = orjson.loads(line)
+            except ValueError:
+                # A torn last line from an interrupted write
+                logger.warning("Skipping unreadable journal record")
+                continue
+
+            # Records written before sequence numbers existed have none and are applied
+            seq = record.get("seq")
+            if seq is not None:
+                if seq <= after_seq:
+                    continue
+                last_seq = max(last_seq, seq)
+
+            op = record.get("op")
+            if op == "add":
+                inst = record["inst"]
+                if inst.get("name") not in by_name:
+                    by_name[inst.get("name")] = len(instances)
+                    instances.append(inst)
+            elif op == "upd":
+                index = by_name.get(record["name"])
+                if index is not None:
+                    merged = {**instances[index], **record["patch"]}
+                    instances[index] = merged
+                    if merged.get("name") != record["name"]:
+                        del by_name[record["name"]]
+                        by_name[merged.get("name")] = index
+            elif op == "del":
+                index = by_name.pop(record["name"], None)
+                if index is not None:
+                    instances.pop(index)
+                    for i in range(index, len(instances)):
+                        by_name[instances[i].get("name")] = i
+            applied += 1
+
+    return applied, last_seq
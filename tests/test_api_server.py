@@ -0,0 +1,164 @@
+import orjson
+import pytest
+
+import api_server
+import storage
+from machine_model import VMInstance, errors_by_index
+from pydantic import TypeAdapter, ValidationError
+
+
+def vm(name, **fields):
+    return {"name": name, "ip": "10.0.0.1", "os": "Ubuntu 22.04", "status": "UP", **fields}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """A test client whose snapshot, journal and backup live in tmp_path, with a small compaction threshold."""
+    monkeypatch.setattr(storage, "INSTANCES_PATH", str(tmp_path / "instances.json"))
+    monkeypatch.setattr(storage, "JOURNAL_PATH", str(tmp_path / "instances.log"))
+    monkeypatch.setattr(storage, "BACKUP_PATH", str(tmp_path / "instances_backup.json"))
+    monkeypatch.setattr(api_server, "INSTANCES_FILE", tmp_path / "instances.json")
+    monkeypatch.setattr(api_server, "JOURNAL_FILE", tmp_path / "instances.log")
+    monkeypatch.setattr(api_server, "COMPACT_THRESHOLD", 3)
+    monkeypatch.setattr(api_server, "_CACHE", {
+        "mtime_ns": -1,
+        "size": -1,
+        "instances": [],
+        "by_name": {},
+        "body": api_server._EMPTY_BODY,
+        "etag": api_server._EMPTY_ETAG,
+        "stats": api_server._new_stats(),
+    })
+    monkeypatch.setattr(api_server, "_JOURNAL", {"file": None, "entries": 0, "seq": 0})
+    yield api_server.app.test_client()
+    restart()
+
+
+def restart():
+    """Drop everything the server holds in memory, as a process restart would."""
+    if api_server._JOURNAL["file"] is not None:
+        api_server._JOURNAL["file"].close()
+    api_server._JOURNAL.update(file=None, entries=0, seq=0)
+    api_server._CACHE["mtime_ns"] = None
+
+
+def names(client):
+    return [inst["name"] for inst in client.get("/instances").json["instances"]]
+
+
+def snapshot():
+    return orjson.loads(api_server.INSTANCES_FILE.read_bytes())
+
+
+def test_first_add_without_snapshot_is_persisted(client):
+    assert client.post("/instances", json=vm("a")).status_code == 201
+
+    assert [inst["name"] for inst in snapshot()["instances"]] == ["a"]
+    restart()
+    assert names(client) == ["a"]
+
+
+def test_journal_replays_across_compaction(client):
+    client.post("/instances", json=vm("a"))
+    client.post("/instances", json=vm("b"))
+    client.put("/instances/a", json={"status": "DOWN"})
+    client.post("/instances", json=vm("c"))   # fills the journal: compaction
+    client.delete("/instances/b")
+    client.put("/instances/c", json={"name": "d"})
+
+    assert snapshot()["seq"] == 4
+    assert api_server._JOURNAL["entries"] == 2
+    expected = names(client)
+    assert expected == ["a", "d"]
+
+    restart()
+    assert names(client) == expected
+    assert client.get("/instances/a").json["status"] == "DOWN"
+    assert client.get("/stats").json["total"] == 2
+    assert [inst["name"] for inst in storage.load_instances()] == expected
+
+
+def test_replay_skips_records_already_compacted(client, monkeypatch):
+    # Crash between writing the snapshot and truncating the journal
+    monkeypatch.setattr(api_server, "_truncate_journal", lambda: api_server._JOURNAL.update(entries=0))
+
+    client.post("/instances", json=vm("a"))                  # seq 1, first snapshot
+    client.put("/instances/a", json={"name": "b"})           # seq 2, journaled
+    client.post("/instances", json=vm("a", ip="10.0.0.2"))   # seq 3, journaled
+    client.post("/instances", json=vm("c"))                  # seq 4, compaction
+
+    assert snapshot()["seq"] == 4
+    assert api_server.JOURNAL_FILE.read_bytes().count(b"\n") == 2
+
+    restart()
+    assert names(client) == ["b", "a", "c"]
+    assert client.get("/instances/a").json["ip"] == "10.0.0.2"
+    assert [inst["name"] for inst in storage.load_instances()] == ["b", "a", "c"]
+
+
+def test_replay_journal_applies_legacy_records_and_skips_old_ones(tmp_path):
+    journal = tmp_path / "instances.log"
+    journal.write_bytes(b"".join(orjson.dumps(record) + b"\n" for record in [
+        {"op": "add", "inst": vm("legacy")},
+        {"op": "add", "inst": vm("old"), "seq": 5},
+        {"op": "del", "name": "a", "seq": 6},
+        {"op": "upd", "name": "b", "patch": {"status": "DOWN"}, "seq": 7},
+    ]) + b'{"op": "add", "in')
+    instances = [vm("a"), vm("b")]
+
+    assert storage.replay_journal(instances, journal, after_seq=5) == (3, 7)
+    assert [(inst["name"], inst["status"]) for inst in instances] == [("b", "DOWN"), ("legacy", "UP")]
+
+
+def test_batch_rejects_duplicates_with_409(client):
+    client.post("/instances", json=vm("a"))
+
+    response = client.post("/instances:batch", json={"instances": [vm("a"), vm("b"), vm("b")]})
+
+    assert response.status_code == 409
+    assert response.json["error"] == "Machines already exist: a, b"
+    assert response.json["names"] == ["a", "b"]
+    assert names(client) == ["a"]
+
+
+def test_batch_reports_errors_per_index(client):
+    response = client.post("/instances:batch", json={"instances": [vm("ok"), {"name": "x"}, vm(" ", cpu_percent=101)]})
+
+    assert response.status_code == 400
+    errors = {err["index"]: err["error"] for err in response.json["errors"]}
+    assert sorted(errors) == [1, 2]
+    assert "ip: Field required" in errors[1]
+    assert "name: Value error, Name cannot be empty" in errors[2]
+    assert "cpu_percent: Input should be less than or equal to 100" in errors[2]
+    assert names(client) == []
+
+
+def test_parallel_batch_validation_keeps_indexes(client, monkeypatch):
+    monkeypatch.setattr(api_server, "PARALLEL_VALIDATION_MIN", 4)
+    monkeypatch.setattr(api_server, "PARALLEL_VALIDATION_CHUNK", 3)
+    items = [vm(f"m{i}") for i in range(8)]
+    items[7] = {"name": "m7"}
+
+    try:
+        response = client.post("/instances:batch", json={"instances": items})
+        assert response.status_code == 400
+        assert [err["index"] for err in response.json["errors"]] == [7]
+
+        response = client.post("/instances:batch", json={"instances": items[:7]})
+        assert response.status_code == 201
+        assert names(client) == [f"m{i}" for i in range(7)]
+    finally:
+        if api_server._POOL is not None:
+            api_server._POOL.shutdown()
+            api_server._POOL = None
+
+
+def test_errors_by_index_shifts_by_offset():
+    with pytest.raises(ValidationError) as info:
+        TypeAdapter(list[VMInstance]).validate_python([vm("a"), vm("b", status="MAYBE"), 3])
+
+    errors = errors_by_index(info.value, offset=10)
+
+    assert sorted(errors) == [11, 12]
+    assert errors[11] == ["status: Input should be 'UP' or 'DOWN'"]
+    assert errors[12] == ["Input should be a valid dictionary or instance of VMInstance"]